@@ -28,6 +28,7 @@ class BenchmarkBase(Benchmark):
     def __init__(self, identifier, ceiling_func, version, parent=None, paper_link=None):
         self._identifier = identifier
         self._ceiling_func = ceiling_func
+        self._ceiling_value = None
         self._version = version
         self.parent = parent
         self.paper_link = paper_link
@@ -42,7 +43,9 @@ class BenchmarkBase(Benchmark):
 
     @property
     def ceiling(self):
-        return self._ceiling(identifier=self.identifier)
+        if self._ceiling_value is None:  # stored on disk, but only load it once per benchmark instance
+            self._ceiling_value = self._ceiling(identifier=self.identifier)
+        return self._ceiling_value
 
     @store()
     def _ceiling(self, identifier):
@@ -1,4 +1,5 @@
 import numpy as np
+from result_caching import cache
 
 import brainscore
 from brainscore.benchmarks import BenchmarkBase
@@ -13,7 +14,7 @@ from brainscore.utils import LazyLoad
 class DicarloRajalingham2018I2n(BenchmarkBase):
     def __init__(self):
         self._metric = I2n()
-        self._fitting_stimuli = brainscore.get_stimulus_set('dicarlo.objectome.public')
+        self._fitting_stimuli = load_fitting_stimuli()
         self._assembly = LazyLoad(lambda: load_assembly('private'))
         self._visual_degrees = 8
         super(DicarloRajalingham2018I2n, self).__init__(
@@ -35,21 +36,20 @@ class DicarloRajalingham2018I2n(BenchmarkBase):
 
     def ceil_score(self, score, ceiling):
         assert set(score.raw['split'].values) == set(ceiling.raw['split'].values)
-        split_scores = []
-        for split in ceiling.raw['split'].values:
-            split_score = score.raw.sel(split=split)
-            split_ceiling = ceiling.raw.sel(split=split)
-            ceiled_split_score = split_score / np.sqrt(split_ceiling)
-            ceiled_split_score = ceiled_split_score.expand_dims('split')
-            ceiled_split_score['split'] = [split]
-            split_scores.append(ceiled_split_score)
-        split_scores = Score.merge(*split_scores)
+        split_ceilings = ceiling.raw.sel(split=score.raw['split'].values)  # align splits
+        split_scores = Score(score.raw / np.sqrt(split_ceilings))
         split_scores = apply_aggregate(self._metric.aggregate, split_scores)
         split_scores.attrs[Score.RAW_VALUES_KEY] = score  # this will override raw per-split ceiled scores which is ok
         split_scores.attrs['ceiling'] = ceiling
         return split_scores
 
 
+@cache()
+def load_fitting_stimuli():
+    return brainscore.get_stimulus_set('dicarlo.objectome.public')
+
+
+@cache()
 def load_assembly(access='private'):
     assembly = brainscore.get_assembly(f'dicarlo.Rajalingham2018.{access}')
     assembly['correct'] = assembly['choice'] == assembly['sample_obj']
@@ -2,10 +2,10 @@ import scipy.stats
 import xarray as xr
 from tqdm import tqdm
 
-from brainio_base.assemblies import walk_coords
 from brainscore.metrics import Score
 from brainscore.metrics.rdm import RDMMetric
 from brainscore.metrics.transformations import CrossValidationSingle
+from brainscore.metrics.utils import walk_coord_dims
 from brainscore.metrics.xarray_utils import Defaults as XarrayDefaults
 from brainscore.metrics.xarray_utils import XarrayCorrelation
 
@@ -56,7 +56,7 @@ class _SplitHalvesConsistency(Ceiling):
 
         def _average_repetitions(self, assembly):
             repetition_dims = assembly[self._split_coord].dims
-            nonrepetition_coords = [coord for coord, dims, values in walk_coords(assembly)
+            nonrepetition_coords = [coord for coord, dims in walk_coord_dims(assembly)
                                     if dims == repetition_dims and coord != self._split_coord]
             average = assembly.multi_groupby(nonrepetition_coords).mean(dim=repetition_dims)
             return average
@@ -5,7 +5,6 @@ import itertools
 import numpy as np
 import scipy.stats
 from numpy.random.mtrand import RandomState
-from scipy.stats import pearsonr
 
 from brainio_base.assemblies import walk_coords, DataAssembly
 from brainscore.metrics import Metric, Score
@@ -158,15 +157,15 @@ class _I(Metric):
         # align
         source_response_matrix = source_response_matrix.sortby('image_id').sortby('choice')
         target_response_matrix = target_response_matrix.sortby('image_id').sortby('choice')
-        assert all(source_response_matrix['image_id'].values == target_response_matrix['image_id'].values)
-        assert all(source_response_matrix['choice'].values == target_response_matrix['choice'].values)
+        assert np.array_equal(source_response_matrix['image_id'].values, target_response_matrix['image_id'].values)
+        assert np.array_equal(source_response_matrix['choice'].values, target_response_matrix['choice'].values)
         # flatten and mask out NaNs
         source, target = source_response_matrix.values.flatten(), target_response_matrix.values.flatten()
         non_nan = ~np.isnan(target)
         non_nan = np.logical_and(non_nan, (~np.isnan(source) if skipna else 1))
         source, target = source[non_nan], target[non_nan]
         assert not any(np.isnan(source))
-        correlation, p = pearsonr(source, target)
+        correlation = np.corrcoef(source, target)[0, 1]  # Pearson r, without scipy's unused p-value computation
         return correlation
 
     @classmethod
@@ -35,7 +35,12 @@ class OSTCorrelation(Metric):
         return score
 
     def _align(self, source, target, on='image_id'):
-        return source.isel(presentation=[np.where(source[on].values == key)[0][0] for key in target[on].values])
+        # first occurrence of every target value in source, looked up via sorted unique values
+        source_values, source_indices = np.unique(source[on].values, return_index=True)
+        target_values = target[on].values
+        assert np.isin(target_values, source_values).all(), f"not all {on} values of target found in source"
+        positions = np.searchsorted(source_values, target_values)
+        return source.isel(presentation=source_indices[positions])
 
     def compute_osts(self, train_source, test_source, test_osts):
         last_osts, hit_osts = [None] * len(test_osts), [None] * len(test_osts)
@@ -51,7 +56,7 @@ class OSTCorrelation(Metric):
             prediction_probabilities = classifier.predict_proba(time_test_source)
             #classifier.close()
             source_i1 = self.i1(prediction_probabilities)
-            assert all(source_i1['image_id'].values == test_osts['image_id'].values)
+            assert np.array_equal(source_i1['image_id'].values, test_osts['image_id'].values)
             for i, (image_source_i1, threshold_i1) in enumerate(zip(
                     source_i1.values, test_osts['i1'].values)):
                 if hit_osts[i] is None:
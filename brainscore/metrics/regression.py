@@ -52,11 +52,8 @@ class SingleRegression():
     def fit(self, X, Y):
         X = X.values
         Y = Y.values
-        n_stim, n_neuroid = X.shape
-        _, n_neuron = Y.shape
-        r = np.zeros((n_neuron, n_neuroid))
-        for neuron in range(n_neuron):
-            r[neuron, :] = pearsonr(X, Y[:, neuron:neuron+1])
+        # correlations of all neuron x neuroid pairs in a single (multi-threaded BLAS) matrix product
+        r = normalized_deviations(Y).T @ normalized_deviations(X)
         self.mapping = np.nanargmax(r, axis=1)
 
     def predict(self, X):
@@ -100,15 +97,15 @@ def single_regression(xarray_kwargs=None):
 
 
 def pearsonr(x, y):
-    xmean = x.mean(axis=0, keepdims=True)
-    ymean = y.mean(axis=0, keepdims=True)
+    r = (normalized_deviations(x) * normalized_deviations(y)).sum(axis=0)
+    return r
 
-    xm = x - xmean
-    ym = y - ymean
 
+def normalized_deviations(x):
+    """
+    Centers every column of `x` and scales it to unit norm,
+    so that the dot product of two such columns is their Pearson correlation.
+    """
+    xm = x - x.mean(axis=0, keepdims=True)
     normxm = scipy.linalg.norm(xm, axis=0, keepdims=True)
-    normym = scipy.linalg.norm(ym, axis=0, keepdims=True)
-
-    r = ((xm/normxm)*(ym/normym)).sum(axis=0)
-
-    return r
+    return xm / normxm
@@ -1,7 +1,9 @@
+import numpy as np
 from xarray import DataArray
 
 from brainio_base.assemblies import merge_data_arrays, walk_coords
 from brainscore.metrics.transformations import apply_aggregate
+from brainscore.metrics.utils import walk_coord_dims
 
 
 class TemporalRegressionAcrossTime:
@@ -19,16 +21,17 @@ class TemporalRegressionAcrossTime:
         self._regression.fit(source, target)
 
     def predict(self, source):
-        predictions = []
-        for time_bin_start, time_bin_end in source['time_bin'].values:
-            time_source = source.sel(time_bin=(time_bin_start, time_bin_end))
-            prediction = self._regression.predict(time_source)
-            prediction = prediction.expand_dims('time_bin_start').expand_dims('time_bin_end')
-            prediction['time_bin_start'] = [time_bin_start]
-            prediction['time_bin_end'] = [time_bin_end]
-            prediction = prediction.stack(time_bin=['time_bin_start', 'time_bin_end'])
-            predictions.append(prediction)
-        return merge_data_arrays(predictions)
+        time_bins = source['time_bin'].values
+        predictions = [self._regression.predict(source.sel(time_bin=time_bin)) for time_bin in time_bins]
+        # all time-bin predictions share their coords: stack the values into one array
+        # rather than expanding and merging every prediction
+        reference = predictions[0]
+        values = np.stack([prediction.transpose(*reference.dims).values for prediction in predictions], axis=-1)
+        coords = {coord: (dims, coord_values) for coord, dims, coord_values in walk_coords(reference)
+                  if coord not in ['time_bin', 'time_bin_start', 'time_bin_end']}
+        coords['time_bin_start'] = 'time_bin', [time_bin_start for time_bin_start, _ in time_bins]
+        coords['time_bin_end'] = 'time_bin', [time_bin_end for _, time_bin_end in time_bins]
+        return type(reference)(values, coords=coords, dims=reference.dims + ('time_bin',))
 
     def _stack_timebins(self, assembly):
         assembly_type = type(assembly)
@@ -66,7 +69,7 @@ class TemporalCorrelationAcrossTime:
 def cross_correlation(prediction, target, cross, correlation):
     assert (prediction[cross] == target[cross]).all()
     scores = []
-    coords = [coord for coord, dims, values in walk_coords(target[cross])]
+    coords = [coord for coord, dims in walk_coord_dims(target[cross])]
     for cross_value in target[cross].values:
         _prediction = prediction.sel(**{cross: cross_value})
         _target = target.sel(**{cross: cross_value})
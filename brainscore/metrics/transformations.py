@@ -1,8 +1,10 @@
 from collections import OrderedDict
 
+import hashlib
 import itertools
 import logging
 import math
+import numbers
 import numpy as np
 import xarray as xr
 from brainio_base.assemblies import DataAssembly, walk_coords
@@ -11,7 +13,7 @@ from sklearn.model_selection import StratifiedShuffleSplit, ShuffleSplit, KFold,
 from tqdm import tqdm
 
 from brainscore.metrics import Score
-from brainscore.metrics.utils import unique_ordered
+from brainscore.metrics.utils import unique_ordered, merge_dicts
 from brainscore.utils import fullname
 
 
@@ -97,9 +99,23 @@ class Alignment(Transformation):
     def align(self, source_assembly, target_assembly):
         dimensions = list(self._order_dimensions) + list(set(source_assembly.dims) - set(self._order_dimensions))
         source_assembly = source_assembly.transpose(*dimensions)
+        alignment_dims = source_assembly[self._alignment_dim].dims
+        if not self._repeat and len(alignment_dims) == 1:
+            # fast path for the common case of unique values on a single dimension (e.g. image_id per presentation):
+            # select the matching positions directly instead of going through the generic `subset`
+            source_values = source_assembly[self._alignment_dim].values
+            target_values = target_assembly[self._alignment_dim].values
+            indexer = np.flatnonzero(np.isin(source_values, target_values))
+            if len(indexer) == len(target_values) and \
+                    len(np.unique(source_values)) == len(source_values) and \
+                    len(np.unique(target_values)) == len(target_values):
+                return source_assembly.isel(**{alignment_dims[0]: indexer})
         return subset(source_assembly, target_assembly, subset_dims=[self._alignment_dim], repeat=self._repeat)
 
     def sort(self, assembly):
+        values = assembly[self._alignment_dim].values
+        if np.all(values[1:] >= values[:-1]):  # already sorted, e.g. when source was aligned to a sorted target
+            return assembly
         return assembly.sortby(self._alignment_dim)
 
 
@@ -114,28 +130,74 @@ class CartesianProduct(Transformation):
         self._dividers = dividers or ()
         self._logger = logging.getLogger(fullname(self))
 
-    def dividers(self, assembly, dividing_coords):
+    def dividers(self, assembly, dividing_coords, divider_indices=None):
         """
         divide data along dividing coords and non-central dimensions,
         i.e. dimensions that the metric is not computed over
         """
         non_matched_coords = [coord for coord in dividing_coords if not hasattr(assembly, coord)]
         assert not non_matched_coords, f"{non_matched_coords} not found in assembly"
-        choices = {coord: unique_ordered(assembly[coord].values) for coord in dividing_coords}
-        combinations = [dict(zip(choices, values)) for values in itertools.product(*choices.values())]
+        if divider_indices is None:
+            divider_indices = self.divider_indices(assembly, dividing_coords)
+        # coords on the same dimension do not vary independently: only combine the values that actually co-occur,
+        # i.e. the groups on every dimension, otherwise the apply function would be invoked on empty selections
+        dim_dividers = [[dict(zip(coords, key)) for key in indices] for coords, indices in divider_indices.values()]
+        combinations = [merge_dicts(dividers) for dividers in itertools.product(*dim_dividers)]
+        # order like the product over every dividing coord's values, in the order of their first occurrence
+        ranks = {}
+        for coord in dividing_coords:
+            ranks[coord] = {}
+            for value in unique_ordered(assembly[coord].values):
+                ranks[coord].setdefault(self._divider_value(value), len(ranks[coord]))
+        combinations = sorted(combinations, key=lambda combination: tuple(
+            ranks[coord][combination[coord]] for coord in dividing_coords))
         return combinations
 
+    def divider_indices(self, assembly, dividing_coords):
+        """
+        group the positions along every divided dimension by the values of the dividing coords on that dimension,
+        so that each divider can be selected positionally rather than with a label lookup
+        :return: a dict `dimension -> (dividing coords, dict coord values -> positions)`
+        """
+        dim_coords = {}
+        for coord in dividing_coords:
+            dims = assembly[coord].dims
+            assert len(dims) == 1
+            dim_coords.setdefault(dims[0], []).append(coord)
+        dim_indices = {}
+        for dim, coords in dim_coords.items():
+            # group manually rather than with pandas' `groupby`, which drops NaN values
+            # and cannot tell a single tuple-valued coord (e.g. time_bin) apart from multiple coords
+            groups = {}
+            coord_values = [assembly[coord].values for coord in coords]
+            for position, values in enumerate(zip(*coord_values)):
+                key = self._divider_key(dict(zip(coords, values)), coords)
+                groups.setdefault(key, []).append(position)
+            dim_indices[dim] = coords, {key: np.array(positions) for key, positions in groups.items()}
+        return dim_indices
+
+    @classmethod
+    def _divider_key(cls, divider, coords):
+        return tuple(cls._divider_value(divider[coord]) for coord in coords)
+
+    @staticmethod
+    def _divider_value(value):
+        # NaN never equals itself, use the single `np.nan` object so that NaN dividers can still be looked up
+        return np.nan if isinstance(value, (float, np.floating)) and np.isnan(value) else value
+
     def pipe(self, assembly):
         """
         :param brainscore.assemblies.NeuroidAssembly assembly:
         :return: brainscore.assemblies.DataAssembly
         """
-        dividers = self.dividers(assembly, dividing_coords=self._dividers)
+        divider_indices = self.divider_indices(assembly, dividing_coords=self._dividers)
+        dividers = self.dividers(assembly, dividing_coords=self._dividers, divider_indices=divider_indices)
         scores = []
         progress = tqdm(enumerate_done(dividers), total=len(dividers), desc='cartesian product')
         for i, divider, done in progress:
             progress.set_description(str(divider))
-            divided_assembly = assembly.multisel(**divider)
+            divided_assembly = assembly.isel(**{dim: indices[self._divider_key(divider, coords)]
+                                                for dim, (coords, indices) in divider_indices.items()})
             # squeeze dimensions if necessary
             for divider_coord in divider:
                 dims = assembly[divider_coord].dims
@@ -170,12 +232,20 @@ class Split:
         stratification_coord = 'object_name'  # cross-validation across images, balancing objects
         unique_split_values = False
         random_state = 1
+        cache_splits = False
 
     def __init__(self,
                  splits=Defaults.splits, train_size=None, test_size=None,
                  split_coord=Defaults.split_coord, stratification_coord=Defaults.stratification_coord, kfold=False,
-                 unique_split_values=Defaults.unique_split_values, random_state=Defaults.random_state):
+                 unique_split_values=Defaults.unique_split_values, random_state=Defaults.random_state,
+                 cache_splits=Defaults.cache_splits):
+        """
+        :param cache_splits: whether to re-use the split indices for repeated calls with the same split and
+            stratification values. Requires an integer `random_state` so that cached splits equal freshly drawn ones.
+        """
         super().__init__()
+        assert not cache_splits or isinstance(random_state, numbers.Integral), \
+            f"cache_splits requires an integer random_state, got {random_state}"
         if train_size is None and test_size is None:
             train_size = self.Defaults.train_size
         if kfold:
@@ -194,9 +264,14 @@ class Split:
         self._split_coord = split_coord
         self._stratification_coord = stratification_coord
         self._unique_split_values = unique_split_values
+        self._split_cache = {} if cache_splits else None
 
         self._logger = logging.getLogger(fullname(self))
 
+    @property
+    def split_coord(self):
+        return self._split_coord
+
     @property
     def do_stratify(self):
         return bool(self._stratification_coord)
@@ -205,8 +280,20 @@ class Split:
         cross_validation_values, indices = extract_coord(assembly, self._split_coord, unique=self._unique_split_values)
         data_shape = np.zeros(len(cross_validation_values))
         args = [assembly[self._stratification_coord].values[indices]] if self.do_stratify else []
-        splits = self._split.split(data_shape, *args)
-        return cross_validation_values, list(splits)
+        if self._split_cache is None:
+            return cross_validation_values, list(self._split.split(data_shape, *args))
+        key = self._split_key(data_shape, *args)
+        if key not in self._split_cache:
+            self._split_cache[key] = list(self._split.split(data_shape, *args))
+        return cross_validation_values, self._split_cache[key]
+
+    @classmethod
+    def _split_key(cls, data_shape, stratification_values=None):
+        if stratification_values is None:
+            return len(data_shape), None
+        # strings are compared by value, not by the object pointers `tobytes` would return for object arrays
+        digest = hashlib.blake2b(np.asarray(stratification_values).astype(str).tobytes()).digest()
+        return len(data_shape), digest
 
     @classmethod
     def aggregate(cls, values):
@@ -232,6 +319,29 @@ def extract_coord(assembly, coord, unique=False):
     return extracted_assembly if not unique else extracted_assembly, indices
 
 
+class CoordSubset:
+    """
+    Selects the parts of an assembly whose `coord` values are contained in the values of a given assembly,
+    equivalent to `subset(assembly, values, dims_must_match=False)`.
+    The assembly's coord values are retrieved only once so that repeated selections,
+    e.g. for every cross-validation split, do not repeat the xarray lookups.
+    """
+
+    def __init__(self, assembly, coord):
+        self._assembly = assembly
+        self._coord = coord
+        dims = assembly[coord].dims
+        # coords on repeated dimensions (e.g. presentation x presentation RDMs) are handled by the generic `subset`
+        self._dim = dims[0] if len(dims) == 1 and assembly.dims.count(dims[0]) == 1 else None
+        self._coord_values = assembly[coord].values if self._dim is not None else None
+
+    def __call__(self, values):
+        if self._dim is None:
+            return subset(self._assembly, values, dims_must_match=False)
+        indexer = np.isin(self._coord_values, values[self._coord].values)
+        return self._assembly.isel(**{self._dim: np.flatnonzero(indexer)})
+
+
 class TestOnlyCrossValidationSingle:
     def __init__(self, *args, **kwargs):
         self._cross_validation = CrossValidationSingle(*args, **kwargs)
@@ -254,11 +364,13 @@ class CrossValidationSingle(Transformation):
     def __init__(self,
                  splits=Split.Defaults.splits, train_size=None, test_size=None,
                  split_coord=Split.Defaults.split_coord, stratification_coord=Split.Defaults.stratification_coord,
-                 unique_split_values=Split.Defaults.unique_split_values, random_state=Split.Defaults.random_state):
+                 unique_split_values=Split.Defaults.unique_split_values, random_state=Split.Defaults.random_state,
+                 cache_splits=Split.Defaults.cache_splits):
         super().__init__()
         self._split = Split(splits=splits, split_coord=split_coord,
                             stratification_coord=stratification_coord, unique_split_values=unique_split_values,
-                            train_size=train_size, test_size=test_size, random_state=random_state)
+                            train_size=train_size, test_size=test_size, random_state=random_state,
+                            cache_splits=cache_splits)
         self._logger = logging.getLogger(fullname(self))
 
     def pipe(self, assembly):
@@ -266,20 +378,19 @@ class CrossValidationSingle(Transformation):
         :param assembly: the assembly to cross-validate over
         """
         cross_validation_values, splits = self._split.build_splits(assembly)
+        assembly_subset = CoordSubset(assembly, self._split.split_coord)
 
         split_scores = []
         for split_iterator, (train_indices, test_indices), done \
                 in tqdm(enumerate_done(splits), total=len(splits), desc='cross-validation'):
             train_values, test_values = cross_validation_values[train_indices], cross_validation_values[test_indices]
-            train = subset(assembly, train_values, dims_must_match=False)
-            test = subset(assembly, test_values, dims_must_match=False)
+            train = assembly_subset(train_values)
+            test = assembly_subset(test_values)
 
             split_score = yield from self._get_result(train, test, done=done)
-            split_score = split_score.expand_dims('split')
-            split_score['split'] = [split_iterator]
             split_scores.append(split_score)
 
-        split_scores = Score.merge(*split_scores)
+        split_scores = merge_split_scores(split_scores)
         yield split_scores
 
     def aggregate(self, score):
@@ -301,37 +412,55 @@ class CrossValidation(Transformation):
 
     def pipe(self, source_assembly, target_assembly):
         # check only for equal values, alignment is given by metadata
-        assert sorted(source_assembly[self._split_coord].values) == sorted(target_assembly[self._split_coord].values)
+        assert np.array_equal(np.sort(source_assembly[self._split_coord].values),
+                              np.sort(target_assembly[self._split_coord].values))
         if self._split.do_stratify:
             assert hasattr(source_assembly, self._stratification_coord)
-            assert sorted(source_assembly[self._stratification_coord].values) == \
-                   sorted(target_assembly[self._stratification_coord].values)
+            assert np.array_equal(np.sort(source_assembly[self._stratification_coord].values),
+                                  np.sort(target_assembly[self._stratification_coord].values))
         cross_validation_values, splits = self._split.build_splits(target_assembly)
+        source_subset = CoordSubset(source_assembly, self._split_coord)
+        target_subset = CoordSubset(target_assembly, self._split_coord)
 
         split_scores = []
         for split_iterator, (train_indices, test_indices), done \
                 in tqdm(enumerate_done(splits), total=len(splits), desc='cross-validation'):
             train_values, test_values = cross_validation_values[train_indices], cross_validation_values[test_indices]
-            train_source = subset(source_assembly, train_values, dims_must_match=False)
-            train_target = subset(target_assembly, train_values, dims_must_match=False)
+            train_source, train_target = source_subset(train_values), target_subset(train_values)
             assert len(train_source[self._split_coord]) == len(train_target[self._split_coord])
-            test_source = subset(source_assembly, test_values, dims_must_match=False)
-            test_target = subset(target_assembly, test_values, dims_must_match=False)
+            test_source, test_target = source_subset(test_values), target_subset(test_values)
             assert len(test_source[self._split_coord]) == len(test_target[self._split_coord])
 
             split_score = yield from self._get_result(train_source, train_target, test_source, test_target,
                                                       done=done)
-            split_score = split_score.expand_dims('split')
-            split_score['split'] = [split_iterator]
             split_scores.append(split_score)
 
-        split_scores = Score.merge(*split_scores)
+        split_scores = merge_split_scores(split_scores)
         yield split_scores
 
     def aggregate(self, score):
         return self._split.aggregate(score)
 
 
+def merge_split_scores(split_scores):
+    """
+    Combines the scores of all splits along a new `split` dimension.
+    """
+    if all(score.ndim == 0 and len(score.coords) == 0 and Score.RAW_VALUES_KEY not in score.attrs
+           for score in split_scores):
+        # plain scalar scores (e.g. RDM or OST correlations): fill one array rather than expanding and merging
+        values = np.empty(len(split_scores))
+        for split_iterator, split_score in enumerate(split_scores):
+            values[split_iterator] = split_score.values
+        return Score(values, coords={'split': np.arange(len(split_scores))}, dims=['split'])
+    expanded_scores = []
+    for split_iterator, split_score in enumerate(split_scores):
+        split_score = split_score.expand_dims('split')
+        split_score['split'] = [split_iterator]
+        expanded_scores.append(split_score)
+    return Score.merge(*expanded_scores)
+
+
 def standard_error_of_the_mean(values, dim):
     return values.std(dim) / math.sqrt(len(values[dim]))
 
@@ -1,6 +1,7 @@
 from collections import OrderedDict
 
 import numpy as np
+import xarray as xr
 
 from brainio_base.assemblies import walk_coords
 
@@ -49,6 +50,19 @@ def rename_dims(dims, rename_dims_list, rename_suffix):
     return [dim if dim not in rename_dims_list else dim + '-' + rename_suffix for dim in dims]
 
 
+def walk_coord_dims(assembly):
+    """
+    walks through coords and all levels like `walk_coords`, but only yields their names and dimensions.
+    Unlike `walk_coords`, this does not materialize the values of every MultiIndex level.
+    """
+    for name, values in assembly.coords.items():
+        if isinstance(values.variable, xr.IndexVariable) and values.variable.level_names:
+            for level in values.variable.level_names:
+                yield level, values.dims
+        else:
+            yield name, values.dims
+
+
 def get_modified_coords(assembly, modifier=lambda name, dims, values: (name, (dims, values))):
     coords = {}
     for name, dims, values in walk_coords(assembly):
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from brainio_base.assemblies import NeuroidAssembly, DataAssembly
+from brainscore.metrics.ost import OSTCorrelation
+
+
+class TestAlign:
+    def test_first_occurrence(self):
+        source = NeuroidAssembly(np.arange(6)[:, np.newaxis],
+                                 coords={'image_id': ('presentation', [3, 1, 3, 0, 2, 1]),
+                                         'repetition': ('presentation', [0, 0, 1, 0, 0, 1]),
+                                         'neuroid_id': ('neuroid', [0])},
+                                 dims=['presentation', 'neuroid'])
+        target = DataAssembly([.1, .2, .3], coords={'image_id': ('presentation', [1, 3, 0])}, dims=['presentation'])
+        aligned = OSTCorrelation()._align(source, target)
+        np.testing.assert_array_equal(aligned['image_id'].values, [1, 3, 0])
+        np.testing.assert_array_equal(aligned['repetition'].values, [0, 0, 0])
+        np.testing.assert_array_equal(aligned.values.squeeze(), [1, 0, 3])
+
+    def test_missing(self):
+        source = NeuroidAssembly(np.arange(3)[:, np.newaxis],
+                                 coords={'image_id': ('presentation', [2, 0, 1]),
+                                         'neuroid_id': ('neuroid', [0])},
+                                 dims=['presentation', 'neuroid'])
+        target = DataAssembly([.1, .2], coords={'image_id': ('presentation', [1, 5])}, dims=['presentation'])
+        with pytest.raises(AssertionError):
+            OSTCorrelation()._align(source, target)
@@ -1,10 +1,11 @@
 import numpy as np
 import pytest
+import scipy.stats
 from pytest import approx
 
 from brainio_base.assemblies import NeuroidAssembly
 from brainscore.metrics.regression import CrossRegressedCorrelation, pls_regression, linear_regression, \
-    pearsonr_correlation
+    single_regression, pearsonr_correlation, SingleRegression
 
 
 class TestCrossRegressedCorrelation:
@@ -21,7 +22,7 @@ class TestCrossRegressedCorrelation:
 
 
 class TestRegression:
-    @pytest.mark.parametrize('regression_ctr', [pls_regression, linear_regression])
+    @pytest.mark.parametrize('regression_ctr', [pls_regression, linear_regression, single_regression])
     def test_small(self, regression_ctr):
         assembly = NeuroidAssembly((np.arange(30 * 25) + np.random.standard_normal(30 * 25)).reshape((30, 25)),
                                    coords={'image_id': ('presentation', np.arange(30)),
@@ -34,3 +35,21 @@ class TestRegression:
         prediction = regression.predict(source=assembly)
         assert all(prediction['image_id'] == assembly['image_id'])
         assert all(prediction['neuroid_id'] == assembly['neuroid_id'])
+
+    def test_single_regression_mapping(self):
+        source = np.random.standard_normal((30, 25))
+        source[:, 3] = 1  # constant neuroid, correlations are nan
+        target = source[:, np.random.permutation(25)[:10]] + .5 * np.random.standard_normal((30, 10))
+        source = NeuroidAssembly(source, coords={'image_id': ('presentation', np.arange(30)),
+                                                 'neuroid_id': ('neuroid', np.arange(25))},
+                                 dims=['presentation', 'neuroid'])
+        target = NeuroidAssembly(target, coords={'image_id': ('presentation', np.arange(30)),
+                                                 'neuroid_id': ('neuroid', np.arange(10))},
+                                 dims=['presentation', 'neuroid'])
+        regression = SingleRegression()
+        regression.fit(source, target)
+        # brute-force: correlate every neuron with every neuroid
+        r = np.array([[scipy.stats.pearsonr(source.values[:, neuroid], target.values[:, neuron])[0]
+                       for neuroid in range(25)] for neuron in range(10)])
+        assert np.isnan(r[:, 3]).all()
+        np.testing.assert_array_equal(regression.mapping, np.nanargmax(r, axis=1))
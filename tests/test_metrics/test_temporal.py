@@ -26,6 +26,10 @@ class TestTemporalRegressionAcrossTime:
         assert all(prediction['image_id'] == assembly['image_id'])
         assert all(prediction['neuroid_id'] == assembly['neuroid_id'])
         assert all(prediction['time_bin'] == assembly['time_bin'])
+        for time_bin in assembly['time_bin'].values:
+            expected = regression._regression.predict(assembly.sel(time_bin=time_bin))
+            actual = prediction.sel(time_bin=time_bin).transpose(*expected.dims)
+            np.testing.assert_array_almost_equal(actual.values, expected.values)
 
 
 class TestTemporalCorrelation:
@@ -1,9 +1,84 @@
 import numpy as np
+import pytest
 
 from brainio_base.assemblies import NeuroidAssembly, DataAssembly
-from brainscore.metrics import Metric, Score
-from brainscore.metrics.transformations import CartesianProduct, CrossValidation, \
-    CrossValidationSingle
+from brainio_collection.transform import subset
+from brainscore.metrics import Metric, Score, transformations
+from brainscore.metrics.transformations import Alignment, CartesianProduct, CrossValidation, \
+    CrossValidationSingle, Split
+
+
+class TestAlignment:
+    @classmethod
+    def _assembly(cls, image_ids):
+        return NeuroidAssembly(np.random.rand(len(image_ids), 3),
+                               coords={'image_id': ('presentation', image_ids),
+                                       'neuroid_id': ('neuroid', list(range(3)))},
+                               dims=['presentation', 'neuroid'])
+
+    def test_align_unique(self):
+        source = self._assembly([5, 3, 1, 4, 2, 0])
+        target = self._assembly([0, 2, 4, 5])
+        aligned = Alignment().align(source, target)
+        expected = subset(source, target, subset_dims=['image_id'], repeat=False)
+        assert aligned.dims == expected.dims
+        np.testing.assert_array_equal(aligned['image_id'].values, expected['image_id'].values)
+        np.testing.assert_array_equal(aligned.values, expected.values)
+
+    @pytest.mark.parametrize(['source_ids', 'target_ids'], [
+        ([0, 1, 1, 2], [0, 1, 2]),  # duplicate ids
+        ([0, 1, 2], [0, 1, 3]),  # missing id
+    ])
+    def test_align_falls_back_to_subset(self, source_ids, target_ids, monkeypatch):
+        subset_calls = []
+
+        def subset_placeholder(*args, **kwargs):
+            subset_calls.append((args, kwargs))
+            return 'subset'
+
+        monkeypatch.setattr(transformations, 'subset', subset_placeholder)
+        aligned = Alignment().align(self._assembly(source_ids), self._assembly(target_ids))
+        assert aligned == 'subset'
+        assert len(subset_calls) == 1
+
+    def test_sort_already_sorted(self):
+        assembly = self._assembly([0, 1, 2, 3])
+        assert Alignment().sort(assembly) is assembly
+
+    def test_sort_unsorted(self):
+        assembly = self._assembly([3, 0, 2, 1])
+        sorted_assembly = Alignment().sort(assembly)
+        np.testing.assert_array_equal(sorted_assembly['image_id'].values, [0, 1, 2, 3])
+        np.testing.assert_array_equal(sorted_assembly.values, assembly.values[[1, 3, 2, 0]])
+
+    def test_sort_strings(self):
+        assembly = self._assembly(['c', 'a', 'b'])
+        sorted_assembly = Alignment().sort(assembly)
+        np.testing.assert_array_equal(sorted_assembly['image_id'].values, ['a', 'b', 'c'])
+        assert Alignment().sort(sorted_assembly) is sorted_assembly
+
+
+class TestSplit:
+    def test_cache_splits(self):
+        assembly = NeuroidAssembly(np.random.rand(100, 10),
+                                   coords={'image_id': ('presentation', list(range(100))),
+                                           'object_name': ('presentation', ['a', 'b'] * 50),
+                                           'neuroid_id': ('neuroid', list(range(10)))},
+                                   dims=['presentation', 'neuroid'])
+        split = Split(splits=5, cache_splits=True)
+        _, splits1 = split.build_splits(assembly)
+        _, splits2 = split.build_splits(assembly)
+        assert splits1 is splits2
+        uncached_split = Split(splits=5)
+        _, uncached_splits = uncached_split.build_splits(assembly)
+        for (train1, test1), (train2, test2) in zip(splits1, uncached_splits):
+            np.testing.assert_array_equal(train1, train2)
+            np.testing.assert_array_equal(test1, test2)
+
+    @pytest.mark.parametrize('random_state', [None, np.random.RandomState(1)])
+    def test_cache_splits_requires_seed(self, random_state):
+        with pytest.raises(AssertionError):
+            Split(cache_splits=True, random_state=random_state)
 
 
 class TestCrossValidationSingle:
@@ -143,6 +218,72 @@ class TestCartesianProduct:
             match = any([actual == target] for actual in placeholder.assemblies)
             assert match, "expected divided assembly not found: {target}"
 
+    def test_two_divisions_same_dim(self):
+        assembly = np.random.rand(100, 4)
+        assembly = NeuroidAssembly(
+            assembly,
+            coords={'neuroid': list(range(assembly.shape[0])),
+                    'division_coord1': ('division', [0, 0, 1, 1]),
+                    'division_coord2': ('division', [0, 1, 2, 3])},
+            dims=['neuroid', 'division'])
+        transformation = CartesianProduct(dividers=['division_coord1', 'division_coord2'])
+        dividers = transformation.dividers(assembly, dividing_coords=['division_coord1', 'division_coord2'])
+        assert dividers == [{'division_coord1': 0, 'division_coord2': 0},
+                            {'division_coord1': 0, 'division_coord2': 1},
+                            {'division_coord1': 1, 'division_coord2': 2},
+                            {'division_coord1': 1, 'division_coord2': 3}]
+
+    def test_two_divisions_same_dim_pipe(self):
+        assembly = np.random.rand(100, 4)
+        assembly = NeuroidAssembly(
+            assembly,
+            coords={'neuroid': list(range(assembly.shape[0])),
+                    'division_coord1': ('division', [0, 0, 1, 1]),
+                    'division_coord2': ('division', [0, 1, 2, 3])},
+            dims=['neuroid', 'division'])
+        transformation = CartesianProduct(dividers=['division_coord1', 'division_coord2'])
+        placeholder = self.MetricPlaceholder()
+        transformation(assembly, apply=placeholder)
+        assert len(placeholder.assemblies) == 4
+        for i, divided_assembly in enumerate(placeholder.assemblies):
+            assert divided_assembly.dims == ('neuroid',)
+            np.testing.assert_array_equal(divided_assembly.values, assembly.values[:, i])
+
+    def test_tuple_valued_division(self):
+        assembly = np.random.rand(100, 2)
+        assembly = NeuroidAssembly(
+            assembly,
+            coords={'neuroid': list(range(assembly.shape[0])),
+                    'time_bin_start': ('time_bin', [70, 90]),
+                    'time_bin_end': ('time_bin', [90, 110])},
+            dims=['neuroid', 'time_bin'])
+        transformation = CartesianProduct(dividers=['time_bin'])
+        dividers = transformation.dividers(assembly, dividing_coords=['time_bin'])
+        assert dividers == [{'time_bin': (70, 90)}, {'time_bin': (90, 110)}]
+
+    @pytest.mark.parametrize('dtype', [np.float64, np.float32])
+    def test_nan_division(self, dtype):
+        assembly = np.random.rand(100, 5)
+        assembly = NeuroidAssembly(
+            assembly,
+            coords={'neuroid': list(range(assembly.shape[0])),
+                    'division_coord': ('division', np.array([0., np.nan, 1., np.nan, np.nan], dtype=dtype))},
+            dims=['neuroid', 'division'])
+        transformation = CartesianProduct(dividers=['division_coord'])
+        dividers = transformation.dividers(assembly, dividing_coords=['division_coord'])
+        assert len(dividers) == 3
+        assert dividers[0]['division_coord'] == 0
+        assert np.isnan(dividers[1]['division_coord'])
+        assert dividers[2]['division_coord'] == 1
+        placeholder = self.MetricPlaceholder()
+        transformation(assembly, apply=placeholder)
+        assert len(placeholder.assemblies) == 3
+        assert placeholder.assemblies[1].shape == (100, 3)
+
+    @pytest.mark.parametrize('nan', [np.nan, np.float64('nan'), np.float32('nan'), np.float16('nan')])
+    def test_nan_divider_key(self, nan):
+        assert CartesianProduct._divider_key({'division_coord': nan}, ['division_coord']) == (np.nan,)
+
     def test_no_expand_raw_level(self):
         assembly = np.random.rand(3, 100)
         assembly = NeuroidAssembly(
@@ -0,0 +1,17 @@
+import numpy as np
+
+from brainio_base.assemblies import NeuroidAssembly, walk_coords
+from brainscore.metrics.utils import walk_coord_dims
+
+
+def test_walk_coord_dims():
+    assembly = NeuroidAssembly(np.random.rand(10, 5, 2),
+                               coords={'image_id': ('presentation', list(range(10))),
+                                       'object_name': ('presentation', ['a', 'b'] * 5),
+                                       'neuroid_id': ('neuroid', list(range(5))),
+                                       'region': ('neuroid', ['IT'] * 5),
+                                       'time_bin_start': ('time_bin', [70, 90]),
+                                       'time_bin_end': ('time_bin', [90, 110])},
+                               dims=['presentation', 'neuroid', 'time_bin'])
+    assembly['stimulus_set'] = 'dicarlo.hvm'
+    assert list(walk_coord_dims(assembly)) == [(name, dims) for name, dims, _ in walk_coords(assembly)]
@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 import scipy.stats
 from pytest import approx
 from sklearn.linear_model import LinearRegression
@@ -73,6 +74,21 @@ class TestXarrayCorrelation:
         score = correlation(jumbled_prediction, prediction)
         assert all(score == approx(1))
 
+    @pytest.mark.parametrize('dtype', [np.float64, np.float32])
+    def test_pearsonr_matches_scipy(self, dtype):
+        prediction = NeuroidAssembly(np.random.rand(500, 10).astype(dtype),
+                                     coords={'image_id': ('presentation', list(range(500))),
+                                             'image_meta': ('presentation', [0] * 500),
+                                             'neuroid_id': ('neuroid', list(range(10))),
+                                             'neuroid_meta': ('neuroid', [0] * 10)},
+                                     dims=['presentation', 'neuroid'])
+        target = prediction + np.random.rand(500, 10).astype(dtype)
+        correlation = XarrayCorrelation(scipy.stats.pearsonr)
+        score = correlation(prediction, target)
+        expected = [scipy.stats.pearsonr(prediction.values[:, i], target.values[:, i])[0] for i in range(10)]
+        # scipy computes in float64 regardless of the input dtype
+        np.testing.assert_allclose(score.values, expected, rtol=1e-10)
+
     def test_neuroid_single_coord(self):
         prediction = NeuroidAssembly(np.random.rand(500, 10),
                                      coords={'image_id': ('presentation', list(range(500))),